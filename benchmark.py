@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+BASELINE_FILE = 'benchmark-baseline.json'
+DEFAULT_SCALES = [1, 2, 4, 8]
+DEFAULT_REPEAT = 7
+DEFAULT_TOLERANCE = 1.5
+DEFAULT_MIN_SLOWDOWN = 0.01
+
+
+def load_day(day):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        f'day-{day}.py')
+    spec = importlib.util.spec_from_file_location(f'day_{day}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_day_01(rng, scale):
+    return [rng.randint(1000, 200000) for _ in range(1000 * scale)]
+
+
+def run_day_01(module, masses):
+    return (sum(module.get_fuel(mass, False) for mass in masses),
+            sum(module.get_fuel(mass, True) for mass in masses))
+
+
+def generate_day_02(rng, scale):
+    program = []
+    for _ in range(2500 * scale):
+        program.extend([rng.choice([1, 2]), 0, 0, 0])
+    program.append(99)
+    for i in range(0, len(program) - 1, 4):
+        program[i + 1] = rng.randrange(len(program))
+        program[i + 2] = rng.randrange(len(program))
+        program[i + 3] = len(program) + rng.randrange(16)
+    return program + [rng.randint(0, 9) for _ in range(16)]
+
+
+def run_day_02(module, program):
+    memory = program[:]
+    module.run_program(memory)
+    return sum(memory) % 1000000007
+
+
+def generate_day_03(rng, scale):
+    wires = []
+    for _ in range(2):
+        wire = []
+        for i in range(100 * scale):
+            direction = 'UD'[rng.randrange(2)] if i % 2 else 'LR'[rng.randrange(2)]
+            wire.append(f'{direction}{rng.randint(1, 500)}')
+        wires.append(wire)
+    return wires
+
+
+def run_day_03(module, wires):
+    return module.find_closest_intersections(wires)
+
+
+def generate_day_04(rng, scale):
+    lower_bound = rng.randint(100000, 500000)
+    return lower_bound, lower_bound + 50000 * scale
+
+
+def run_day_04(module, bounds):
+    return module.count_passwords(*bounds)
+
+
+def generate_day_05(rng, scale):
+    iterations = 1000 * scale
+    return [1001, 20, -1, 20,
+            1001, 19, rng.randint(1, 9), 19,
+            1007, 20, 1, 21,
+            4, 19,
+            1006, 21, 0,
+            99, 0, 0,
+            iterations, 0]
+
+
+def run_day_05(module, program):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        module.run_program(program[:])
+    return sum(int(line) for line in output.getvalue().split())
+
+
+def generate_day_06(rng, scale):
+    names = ['COM']
+    graph = {}
+    for i in range(2000 * scale):
+        name = f'N{i}'
+        graph[name] = names[rng.randrange(max(0, len(names) - 50), len(names))]
+        names.append(name)
+    graph['YOU'] = rng.choice(names)
+    graph['SAN'] = rng.choice(names)
+    return graph
+
+
+def run_day_06(module, graph):
+    return module.get_checksum(graph), module.get_steps_to_santa(graph)
+
+
+def generate_day_07(rng, scale):
+    def amplifier(iterations):
+        return [3, 23,
+                3, 24,
+                1, 24, 23, 24,
+                1001, 24, rng.randint(1, 9), 24,
+                4, 24,
+                1001, 25, -1, 25,
+                1005, 25, 2,
+                99,
+                0, 0, 0, iterations]
+
+    return amplifier(1), amplifier(50 * scale)
+
+
+def run_day_07(module, programs):
+    module.stage_output_cache.clear()
+    chain_program, feedback_program = programs
+    return (max(module.run_phase_settings(chain_program, list(itertools.permutations(range(5))), False)),
+            max(module.run_phase_settings(feedback_program, list(itertools.permutations(range(5, 10))), True)))
+
+
+def generate_day_08(rng, scale):
+    return [rng.choice([0, 1, 2, 2]) for _ in range(25 * 6 * 100 * scale)]
+
+
+def run_day_08(module, digits):
+    layers = module.get_layers(digits, 25, 6)
+    return module.get_checksum(layers), module.merge_layers(layers, 25, 6)
+
+
+def generate_day_09(rng, scale):
+    iterations = 5000 * scale
+    return [1101, 0, iterations, 100,
+            1001, 100, -1, 100,
+            1005, 100, 4,
+            4, 100,
+            99]
+
+
+def run_day_09(module, program):
+    computer = module.IntcodeComputer(program)
+    computer.run()
+    return computer.get_last_output()
+
+
+def generate_day_10(rng, scale):
+    size = int(30 * scale ** 0.5)
+    return [(x, y) for y in range(size) for x in range(size)
+            if rng.random() < 0.3]
+
+
+def run_day_10(module, points):
+    asteroids = [module.Asteroid(x, y) for x, y in points]
+    station, count = module.find_best_station(asteroids)
+    return tuple(station), count
+
+
+def generate_day_11(rng, scale):
+    iterations = 2000 * scale
+    return [3, 30,
+            1008, 30, 0, 31,
+            4, 31,
+            4, 30,
+            1001, 32, -1, 32,
+            1005, 32, 0,
+            99] + [0] * 12 + [0, 0, iterations]
+
+
+def run_day_11(module, program):
+    return module.paint_hull(program, 0).painted_count()
+
+
+def generate_day_12(rng, scale):
+    return [[rng.randint(-20, 20) for _ in range(3)] for _ in range(64 * scale)]
+
+
+def run_day_12(module, positions):
+    moons = module.MoonSystem(positions)
+    moons.step(1000)
+    return moons.total_energy()
+
+
+def generate_day_13(rng, scale):
+    iterations = 2000 * scale
+    return [4, 40,
+            4, 41,
+            104, 2,
+            1001, 40, 1, 40,
+            1001, 42, -1, 42,
+            1005, 42, 0,
+            99] + [0] * 22 + [0, rng.randint(0, 20), iterations]
+
+
+def run_day_13(module, program):
+    return module.count_blocks(program)
+
+
+BENCHMARKS = {
+    '01': (generate_day_01, run_day_01),
+    '02': (generate_day_02, run_day_02),
+    '03': (generate_day_03, run_day_03),
+    '04': (generate_day_04, run_day_04),
+    '05': (generate_day_05, run_day_05),
+    '06': (generate_day_06, run_day_06),
+    '07': (generate_day_07, run_day_07),
+    '08': (generate_day_08, run_day_08),
+    '09': (generate_day_09, run_day_09),
+    '10': (generate_day_10, run_day_10),
+    '11': (generate_day_11, run_day_11),
+    '12': (generate_day_12, run_day_12),
+    '13': (generate_day_13, run_day_13),
+}
+
+
+def measure(run, module, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run(module, data)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run(module, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'min': timings[0],
+        'median': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(0.95 * len(timings)))],
+        'peak_memory': peak,
+        'result': json.loads(json.dumps(result)),
+    }
+
+
+def compare(key, stats, baseline, tolerance, min_slowdown):
+    problems = []
+    if key not in baseline:
+        return problems
+    expected = baseline[key]
+    if stats['result'] != expected['result']:
+        problems.append(
+            f'{key}: result {stats["result"]} != baseline {expected["result"]}')
+    expected_min = expected.get('min', expected['median'])
+    if (stats['min'] > expected_min * tolerance and
+            stats['min'] - expected_min > min_slowdown):
+        problems.append(
+            f'{key}: min {stats["min"]:.4f}s > {tolerance}x baseline {expected_min:.4f}s')
+    if stats['peak_memory'] > expected['peak_memory'] * tolerance:
+        problems.append(
+            f'{key}: peak memory {stats["peak_memory"]} > {tolerance}x baseline {expected["peak_memory"]}')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', nargs='+', default=sorted(BENCHMARKS))
+    parser.add_argument('--scales', nargs='+', type=int, default=DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=2019)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--min-slowdown', type=float, default=DEFAULT_MIN_SLOWDOWN)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    problems = []
+    print(f'{"day":<5}{"scale":>6}{"min (s)":>12}{"median (s)":>14}{"p95 (s)":>12}{"peak (KiB)":>14}')
+    for day in args.days:
+        generate, run = BENCHMARKS[day]
+        module = load_day(day)
+        for scale in args.scales:
+            data = generate(random.Random(args.seed), scale)
+            stats = measure(run, module, data, args.repeat)
+            key = f'{day}x{scale}'
+            results[key] = stats
+            problems.extend(compare(key, stats, baseline, args.tolerance, args.min_slowdown))
+            print(f'{day:<5}{scale:>6}{stats["min"]:>12.4f}{stats["median"]:>14.4f}{stats["p95"]:>12.4f}'
+                  f'{stats["peak_memory"] / 1024:>14.1f}')
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+
+    if problems:
+        print('Regressions:', file=sys.stderr)
+        for problem in problems:
+            print(f'  {problem}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import sys
+
+RENDER_TABLE = bytes.maketrans(b'\x00\x01', b' X')
+
+GLYPH_WIDTH = 4
+GLYPH_HEIGHT = 6
+GLYPH_SPACING = 1
+UNKNOWN_GLYPH = '?'
+
+GLYPHS = {
+    ('.##.', '#..#', '#..#', '####', '#..#', '#..#'): 'A',
+    ('###.', '#..#', '###.', '#..#', '#..#', '###.'): 'B',
+    ('.##.', '#..#', '#...', '#...', '#..#', '.##.'): 'C',
+    ('####', '#...', '###.', '#...', '#...', '####'): 'E',
+    ('####', '#...', '###.', '#...', '#...', '#...'): 'F',
+    ('.##.', '#..#', '#...', '#.##', '#..#', '.###'): 'G',
+    ('#..#', '#..#', '####', '#..#', '#..#', '#..#'): 'H',
+    ('..##', '...#', '...#', '...#', '#..#', '.##.'): 'J',
+    ('#..#', '#.#.', '##..', '#.#.', '#.#.', '#..#'): 'K',
+    ('#...', '#...', '#...', '#...', '#...', '####'): 'L',
+    ('.##.', '#..#', '#..#', '#..#', '#..#', '.##.'): 'O',
+    ('###.', '#..#', '#..#', '###.', '#...', '#...'): 'P',
+    ('###.', '#..#', '#..#', '###.', '#.#.', '#..#'): 'R',
+    ('.###', '#...', '#...', '.##.', '...#', '###.'): 'S',
+    ('#..#', '#..#', '#..#', '#..#', '#..#', '.##.'): 'U',
+    ('####', '...#', '..#.', '.#..', '#...', '####'): 'Z',
+}
+GLYPH_TABLE = bytes.maketrans(b'\x00\x01', b'.#')
+
+
+def render_bitmap(pixels):
+    return '\n'.join(bytes(row).translate(RENDER_TABLE).decode() for row in pixels)
+
+
+def write_bitmap(pixels, file=sys.stdout):
+    file.write(render_bitmap(pixels) + '\n')
+
+
+def decode_letters(pixels):
+    rows = [bytes(row).translate(GLYPH_TABLE).decode() for row in pixels]
+    if len(rows) != GLYPH_HEIGHT:
+        raise ValueError(f"Invalid glyph image height {len(rows)}")
+
+    cell_width = GLYPH_WIDTH + GLYPH_SPACING
+    width = max(len(row) for row in rows)
+    letters = []
+    for left in range(0, width, cell_width):
+        glyph = tuple(row[left:left + GLYPH_WIDTH].ljust(GLYPH_WIDTH, '.')
+                      for row in rows)
+        letters.append(GLYPHS.get(glyph, UNKNOWN_GLYPH))
+    return ''.join(letters)
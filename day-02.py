@@ -1,14 +1,20 @@
 #!/usr/bin/env python
 
-import sys
+import functools
+import operator
+
+import numpy as np
+
+from intcode_batch import BatchIntcodeComputer
+from intcode_loader import load_program
+from intcode_sweep import sweep
 
 PART_2_TARGET_VALUE = 19690720
+SWEEP_CHUNK_SIZE = 1000
 
 
 def main():
-    with open('day-02-input.txt') as f:
-        values = f.readline().strip().split(',')
-    values = [int(x) for x in values]
+    values = load_program('day-02-input.txt').tolist()
 
     memory = values[:]
     memory[1] = 12
@@ -16,15 +22,130 @@ def main():
     run_program(memory)
     print(f'Part 1: {memory[0]}')
 
+    match = solve_noun_verb(values, PART_2_TARGET_VALUE)
+    if match is None:
+        candidates = [(noun, verb) for noun in range(0, 100)
+                      for verb in range(0, 100)]
+        match = sweep(values, candidates, functools.partial(
+            operator.eq, PART_2_TARGET_VALUE), run_candidates, SWEEP_CHUNK_SIZE)
+    if match is not None:
+        noun, verb = match
+        print(f'Part 2: {100 * noun + verb}')
+
+
+def solve_noun_verb(values, target):
+    memory = run_program_symbolic(values, [1, 2])
+    if memory is None or memory[0] is None:
+        return None
+
+    output = memory[0]
     for noun in range(0, 100):
-        for verb in range(0, 100):
-            memory = values[:]
-            memory[1] = noun
-            memory[2] = verb
-            run_program(memory)
-            if memory[0] == PART_2_TARGET_VALUE:
-                print(f'Part 2: {100 * noun + verb}')
-                sys.exit(0)
+        verb_coefficients = {}
+        for (noun_exponent, verb_exponent), coefficient in output.items():
+            verb_coefficients[verb_exponent] = verb_coefficients.get(
+                verb_exponent, 0) + coefficient * noun ** noun_exponent
+
+        if max(verb_coefficients, default=0) <= 1:
+            constant = verb_coefficients.get(0, 0)
+            slope = verb_coefficients.get(1, 0)
+            if slope == 0:
+                if constant == target:
+                    return noun, 0
+            elif (target - constant) % slope == 0 and 0 <= (target - constant) // slope < 100:
+                return noun, (target - constant) // slope
+        else:
+            for verb in range(0, 100):
+                if evaluate_polynomial(verb_coefficients, [verb]) == target:
+                    return noun, verb
+    return None
+
+
+def run_program_symbolic(values, input_cells):
+    num_inputs = len(input_cells)
+    memory = [make_constant(value, num_inputs) for value in values]
+    for i, cell in enumerate(input_cells):
+        memory[cell] = {tuple(1 if j == i else 0 for j in range(num_inputs)): 1}
+
+    i = 0
+    while i < len(memory):
+        opcode = get_constant(memory[i])
+        if opcode in (1, 2):
+            input1_index = get_constant(memory[i + 1])
+            input2_index = get_constant(memory[i + 2])
+            target_index = get_constant(memory[i + 3])
+            if target_index is None:
+                return None
+            if input1_index is None or input2_index is None:
+                memory[target_index] = None
+            elif memory[input1_index] is None or memory[input2_index] is None:
+                memory[target_index] = None
+            elif opcode == 1:
+                memory[target_index] = add_polynomials(
+                    memory[input1_index], memory[input2_index])
+            else:
+                memory[target_index] = multiply_polynomials(
+                    memory[input1_index], memory[input2_index])
+            i += 4
+        elif opcode is None:
+            return None
+        else:
+            break
+    return memory
+
+
+def make_constant(value, num_inputs):
+    return {(0,) * num_inputs: value} if value != 0 else {}
+
+
+def get_constant(polynomial):
+    if polynomial is None:
+        return None
+    if not polynomial:
+        return 0
+    if len(polynomial) == 1:
+        exponents, coefficient = next(iter(polynomial.items()))
+        if not any(exponents):
+            return coefficient
+    return None
+
+
+def add_polynomials(first, second):
+    result = dict(first)
+    for exponents, coefficient in second.items():
+        result[exponents] = result.get(exponents, 0) + coefficient
+        if result[exponents] == 0:
+            del result[exponents]
+    return result
+
+
+def multiply_polynomials(first, second):
+    result = {}
+    for first_exponents, first_coefficient in first.items():
+        for second_exponents, second_coefficient in second.items():
+            exponents = tuple(a + b for a, b in zip(first_exponents, second_exponents))
+            result[exponents] = result.get(exponents, 0) + \
+                first_coefficient * second_coefficient
+            if result[exponents] == 0:
+                del result[exponents]
+    return result
+
+
+def evaluate_polynomial(polynomial, inputs):
+    total = 0
+    for exponents, coefficient in polynomial.items():
+        term = coefficient
+        for value, exponent in zip(inputs, exponents):
+            term *= value ** exponent
+        total += term
+    return total
+
+
+def run_candidates(values, candidates, input_cells=(1, 2), output_cell=0):
+    computer = BatchIntcodeComputer(values, len(candidates), strict=False)
+    for cell, column in zip(input_cells, np.array(candidates, dtype=np.int64).T):
+        computer.poke(cell, column)
+    computer.run()
+    return computer.peek(output_cell)
 
 
 def run_program(values):
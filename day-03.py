@@ -1,40 +1,100 @@
 #!/usr/bin/env python
 
 import sys
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+
+MOVES = {'U': (0, 1), 'D': (0, -1), 'R': (1, 0), 'L': (-1, 0)}
+
+Segment = namedtuple('Segment', 'x1 y1 x2 y2 steps x_slope y_slope')
 
 
 def main():
     with open('day-03-input.txt') as f:
         values = f.readlines()
     wires = [x.strip().split(',')for x in values]
-    moves = {'U': (0, 1), 'D': (0, -1), 'R': (1, 0), 'L': (-1, 0)}
-    points = []
-    for wire in wires:
-        wire_points = {}
-        point = (0, 0)
-        distance = 1
-        for step in wire:
-            move_dir = step[:1]
-            move_count = int(step[1:])
-            for _ in range(move_count):
-                point = (point[0] + moves[move_dir][0],
-                         point[1] + moves[move_dir][1])
-                if point not in wire_points:
-                    wire_points[point] = distance
-                distance += 1
-        points.append(wire_points)
-
-    intersections = set.intersection(*[set(x) for x in points])
-
-    closest_by_distance = min(
-        intersections, key=lambda x: abs(x[0]) + abs(x[1]))
-    print(
-        f'Part 1: {abs(closest_by_distance[0]) + abs(closest_by_distance[1])}')
-
-    closest_by_steps = min(
-        intersections, key=lambda x: points[0][x] + points[1][x])
-    print(
-        f'Part 2: {points[0][closest_by_steps] + points[1][closest_by_steps]}')
+
+    closest_distance, fewest_steps = find_closest_intersections(wires)
+    print(f'Part 1: {closest_distance}')
+    print(f'Part 2: {fewest_steps}')
+
+
+def find_closest_intersections(wires):
+    if not wires:
+        raise ValueError("No wires to intersect")
+    pieces = get_wire_segments(wires[0])
+    for wire in wires[1:]:
+        index = SegmentIndex(get_wire_segments(wire))
+        pieces = [Segment(max(piece.x1, segment.x1), max(piece.y1, segment.y1),
+                          min(piece.x2, segment.x2), min(piece.y2, segment.y2),
+                          piece.steps + segment.steps,
+                          piece.x_slope + segment.x_slope,
+                          piece.y_slope + segment.y_slope)
+                  for piece in pieces
+                  for segment in index.overlapping(piece)]
+    if not pieces:
+        raise ValueError("The wires do not intersect")
+
+    closest_distance = min(get_range_distance(piece.x1, piece.x2) +
+                           get_range_distance(piece.y1, piece.y2)
+                           for piece in pieces)
+    fewest_steps = min(min(get_steps(piece, piece.x1, piece.y1),
+                           get_steps(piece, piece.x2, piece.y2))
+                       for piece in pieces)
+    return closest_distance, fewest_steps
+
+
+def get_range_distance(low, high):
+    if low <= 0 <= high:
+        return 0
+    return min(abs(low), abs(high))
+
+
+def get_steps(segment, x, y):
+    return segment.steps + segment.x_slope * x + segment.y_slope * y
+
+
+def get_wire_segments(wire):
+    segments = []
+    x, y = 0, 0
+    distance = 0
+    for step in wire:
+        move_x, move_y = MOVES[step[:1]]
+        move_count = int(step[1:])
+        if move_count <= 0:
+            continue
+        end_x = x + move_x * move_count
+        end_y = y + move_y * move_count
+        segments.append(Segment(min(x + move_x, end_x), min(y + move_y, end_y),
+                                max(x + move_x, end_x), max(y + move_y, end_y),
+                                distance - move_x * x - move_y * y, move_x, move_y))
+        x, y = end_x, end_y
+        distance += move_count
+    return segments
+
+
+class SegmentIndex():
+    def __init__(self, segments):
+        self.__horizontal = sorted((s for s in segments if s.y1 == s.y2),
+                                   key=lambda s: s.y1)
+        self.__vertical = sorted((s for s in segments if s.y1 != s.y2),
+                                 key=lambda s: s.x1)
+        self.__horizontal_ys = [s.y1 for s in self.__horizontal]
+        self.__vertical_xs = [s.x1 for s in self.__vertical]
+
+    def overlapping(self, box):
+        start = bisect_left(self.__horizontal_ys, box.y1)
+        end = bisect_right(self.__horizontal_ys, box.y2)
+        for segment in self.__horizontal[start:end]:
+            if segment.x1 <= box.x2 and box.x1 <= segment.x2:
+                yield segment
+
+        start = bisect_left(self.__vertical_xs, box.x1)
+        end = bisect_right(self.__vertical_xs, box.x2)
+        for segment in self.__vertical[start:end]:
+            if segment.y1 <= box.y2 and box.y1 <= segment.y2:
+                yield segment
 
 
 if __name__ == '__main__':
@@ -1,5 +1,9 @@
 #!/usr/bin/env python
 
+import functools
+
+MAX_TRACKED_RUN = 3
+
 
 def main():
     with open('day-04-input.txt') as f:
@@ -7,53 +11,69 @@ def main():
         lower_bound = int(bounds[0])
         upper_bound = int(bounds[1])
 
-    count1 = 0
-    count2 = 0
-    for i in range(lower_bound, upper_bound + 1):
-        digits = get_digits(i)
-        if is_increasing(digits):
-            min_adjacent = min_adjacent_duplicates(digits)
-            if min_adjacent >= 2:
-                count1 += 1
-            if min_adjacent == 2:
-                count2 += 1
-
+    count1, count2 = count_passwords(lower_bound, upper_bound)
     print(f'Part 1: {count1}')
     print(f'Part 2: {count2}')
 
 
-def get_digits(value):
-    digits = []
-    while value > 0:
-        digits.insert(0, value % 10)
-        value //= 10
-    return digits
-
-
-def min_adjacent_duplicates(digits):
-    has_adjacent = False
-    count = 0
-    min = 100
-    current = -1
-    for i in range(len(digits)):
-        if current != digits[i]:
-            current = digits[i]
-            if count >= 2 and count < min:
-                min = count
-            count = 1
-        elif current == digits[i - 1]:
-            has_adjacent = True
-            count += 1
-    if count >= 2 and count < min:
-        min = count
-    return min if has_adjacent else 0
-
-
-def is_increasing(digits):
-    for i in range(1, len(digits)):
-        if digits[i] < digits[i - 1]:
-            return False
-    return True
+def count_passwords(lower_bound, upper_bound):
+    if upper_bound < lower_bound:
+        return 0, 0
+    count_completions.cache_clear()
+    upper1, upper2 = count_passwords_up_to(upper_bound)
+    lower1, lower2 = count_passwords_up_to(lower_bound - 1)
+    return upper1 - lower1, upper2 - lower2
+
+
+def count_passwords_up_to(bound):
+    if bound < 1:
+        return 0, 0
+    digits = [int(x) for x in str(bound)]
+
+    count1, count2 = 0, 0
+    for length in range(1, len(digits)):
+        for digit in range(1, 10):
+            more1, more2 = count_completions(
+                add_digit(None, digit), length - 1)
+            count1 += more1
+            count2 += more2
+
+    state = None
+    for position, bound_digit in enumerate(digits):
+        lowest = state[0] if state else 1
+        for digit in range(lowest, bound_digit):
+            more1, more2 = count_completions(
+                add_digit(state, digit), len(digits) - position - 1)
+            count1 += more1
+            count2 += more2
+        if bound_digit < lowest:
+            return count1, count2
+        state = add_digit(state, bound_digit)
+
+    more1, more2 = count_completions(state, 0)
+    return count1 + more1, count2 + more2
+
+
+def add_digit(state, digit):
+    if state is None:
+        return digit, 1, False, False
+    last, run, has_double, has_pair = state
+    if digit == last:
+        return digit, min(run + 1, MAX_TRACKED_RUN), True, has_pair
+    return digit, 1, has_double, has_pair or run == 2
+
+
+@functools.lru_cache(maxsize=None)
+def count_completions(state, remaining):
+    if remaining == 0:
+        _, run, has_double, has_pair = state
+        return int(has_double), int(has_pair or run == 2)
+    count1, count2 = 0, 0
+    for digit in range(state[0], 10):
+        more1, more2 = count_completions(add_digit(state, digit), remaining - 1)
+        count1 += more1
+        count2 += more2
+    return count1, count2
 
 
 if __name__ == '__main__':
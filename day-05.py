@@ -2,6 +2,8 @@
 
 from collections import namedtuple
 
+from intcode_loader import load_program
+
 ADD = 1
 MULTIPLY = 2
 INPUT = 3
@@ -29,8 +31,7 @@ IMMEDIATE_MODE = 1
 
 
 def main():
-    with open('day-05-input.txt') as f:
-        values = [int(x) for x in f.readline().strip().split(',')]
+    values = load_program('day-05-input.txt').tolist()
 
     memory = values[:]
     run_program(memory)
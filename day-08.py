@@ -2,6 +2,8 @@
 
 import sys
 
+from bitmap import decode_letters, write_bitmap
+
 IMAGE_WIDTH = 25
 IMAGE_HEIGHT = 6
 
@@ -10,11 +12,21 @@ def main():
     with open('day-08-input.txt') as f:
         input = [int(x) for x in f.readline()]
 
-    layers = []
-    for i in range(len(input) // (IMAGE_WIDTH * IMAGE_HEIGHT)):
-        layers.append([input[j + (i * IMAGE_WIDTH * IMAGE_HEIGHT)]
-                       for j in range(IMAGE_WIDTH * IMAGE_HEIGHT)])
+    layers = get_layers(input, IMAGE_WIDTH, IMAGE_HEIGHT)
+    print(f'Part 1: {get_checksum(layers)}')
+
+    image = merge_layers(layers, IMAGE_WIDTH, IMAGE_HEIGHT)
+    print(f'Part 2: {decode_letters(image)}')
+    write_bitmap(image)
+
+
+def get_layers(digits, width, height):
+    layer_size = width * height
+    return [digits[i * layer_size:(i + 1) * layer_size]
+            for i in range(len(digits) // layer_size)]
+
 
+def get_checksum(layers):
     min_zeroes = sys.maxsize
     min_zeroes_layer = None
     for layer in layers:
@@ -25,21 +37,19 @@ def main():
 
     num_ones = sum(1 for i in min_zeroes_layer if i == 1)
     num_twos = sum(1 for i in min_zeroes_layer if i == 2)
-    print(f'Part 1: {num_ones * num_twos}')
-
-    print(f'Part 2:')
-    for i in range(IMAGE_HEIGHT):
-        for j in range(IMAGE_WIDTH):
-            layer_index = i * IMAGE_WIDTH + j
-            for layer in layers:
-                if layer[layer_index] == 2:
-                    continue
-                if layer[layer_index] == 0:
-                    print(' ', end='')
-                elif layer[layer_index] == 1:
-                    print('X', end='')
-                break
-        print()
+    return num_ones * num_twos
+
+
+def merge_layers(layers, width, height):
+    image = []
+    for i in range(height):
+        row = []
+        for j in range(width):
+            layer_index = i * width + j
+            row.append(next((layer[layer_index] for layer in layers
+                             if layer[layer_index] != 2), 0))
+        image.append(row)
+    return image
 
 
 if __name__ == "__main__":
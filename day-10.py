@@ -1,8 +1,17 @@
 #!/usr/bin/env python
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import math
 
+import numpy as np
+
+VISIBILITY_CHUNK_ELEMENTS = 1 << 22
+DIRECTION_TABLE_SIZE = 1 << 24
+DIRECTION_TABLE_PAYOFF = 8
+VAPORISED_TARGET = 200
+
 Asteroid = namedtuple('Asteroid', 'x y')
 
 
@@ -11,47 +20,102 @@ def main():
         asteroids = [Asteroid(x, y) for y, line in enumerate(
             f.readlines()) for x, value in enumerate(line) if value == "#"]
 
-    max_count = 0
-    station = None
-    for asteroid in asteroids:
-        temp = asteroids[:]
-        temp.remove(asteroid)
-        count = len(set([math.atan2(target.y - asteroid.y,
-                                    target.x - asteroid.x) for target in asteroids]))
-        if count > max_count:
-            max_count = count
-            station = asteroid
+    station, max_count = find_best_station(asteroids)
     print(f"Part 1: {max_count}")
 
-    asteroid_to_distance = {target: (
-        (target.y - station.y)**2 + (target.x - station.x)**2)**(1/2) for target in asteroids}
-    asteroid_to_angle = {target: -1 * math.atan2(
-        target.y - station.y, target.x - station.x) for target in asteroids}
-    angles = {angle: [] for angle in set(asteroid_to_angle.values())}
-    for asteroid in asteroid_to_angle:
-        angles[asteroid_to_angle[asteroid]].append(asteroid)
-        angles[asteroid_to_angle[asteroid]].sort(
-            key=lambda x: asteroid_to_distance[x])
-
-    ordered_angles = sorted(angles.keys())
-    for i, angle in enumerate(ordered_angles):
-        if angle > math.pi / 2:
-            ordered_angles = list(
-                reversed(ordered_angles[:i])) + list(reversed(ordered_angles[i:]))
-            break
-
-    removed_count = 0
-    i = 0
-    while True:
-        angle = ordered_angles[i]
-        asteroids = angles[angle]
-        if len(asteroids) > 0:
-            removed = asteroids.pop(0)
-            removed_count += 1
-        if removed_count == 200:
-            print(f"Part 2: {removed.x * 100 + removed.y}")
-            break
-        i = (i + 1) % len(ordered_angles)
+    order = plan_vaporisation(station, asteroids)
+    if len(order) < VAPORISED_TARGET:
+        raise ValueError(f"Only {len(order)} asteroids can be vaporised")
+    vaporised = asteroids[order[VAPORISED_TARGET - 1]]
+    print(f"Part 2: {vaporised.x * 100 + vaporised.y}")
+
+
+def plan_vaporisation(station, asteroids):
+    xs = np.array([asteroid.x for asteroid in asteroids], dtype=np.int64)
+    ys = np.array([asteroid.y for asteroid in asteroids], dtype=np.int64)
+    targets = np.flatnonzero((xs != station.x) | (ys != station.y))
+    dx = xs[targets] - station.x
+    dy = ys[targets] - station.y
+    distances = np.gcd(dx, dy)
+    dx //= distances
+    dy //= distances
+
+    by_ray = np.lexsort((distances, dy, dx))
+    ray_dx = dx[by_ray]
+    ray_dy = dy[by_ray]
+    positions = np.arange(len(by_ray))
+    new_ray = np.ones(len(by_ray), dtype=bool)
+    new_ray[1:] = (ray_dx[1:] != ray_dx[:-1]) | (ray_dy[1:] != ray_dy[:-1])
+    ray_starts = np.maximum.accumulate(np.where(new_ray, positions, 0))
+    ranks = np.empty(len(by_ray), dtype=np.int64)
+    ranks[by_ray] = positions - ray_starts
+
+    angles = np.arctan2(dx, -dy) % (2 * math.pi)
+    return targets[np.lexsort((angles, ranks))]
+
+
+def reduce_directions(dx, dy, extent, code_base):
+    divisors = np.gcd(dx, dy)
+    divisors[divisors == 0] = 1
+    return (dx // divisors + extent) * code_base + dy // divisors + extent
+
+
+def build_direction_table(extent, code_base):
+    offsets = np.arange(-extent, extent + 1, dtype=np.int64)
+    table = np.empty((code_base, code_base), dtype=np.int32)
+    chunk_size = max(1, VISIBILITY_CHUNK_ELEMENTS // code_base)
+    for chunk_start in range(0, code_base, chunk_size):
+        chunk_end = min(code_base, chunk_start + chunk_size)
+        table[chunk_start:chunk_end] = reduce_directions(
+            offsets[chunk_start:chunk_end, None], offsets[None], extent, code_base)
+    return table.ravel()
+
+
+def count_visible(xs, ys, start, end):
+    extent = int(max(xs.max() - xs.min(), ys.max() - ys.min()))
+    code_base = 2 * extent + 1
+    chunk_size = max(1, VISIBILITY_CHUNK_ELEMENTS // len(xs))
+    table_size = code_base * code_base
+    num_lookups = len(xs) * (end - start)
+    if table_size <= DIRECTION_TABLE_SIZE and num_lookups >= DIRECTION_TABLE_PAYOFF * table_size:
+        table = build_direction_table(extent, code_base)
+        scaled_xs = (xs * code_base).astype(np.int32)
+        ys = ys.astype(np.int32)
+    else:
+        table = None
+
+    counts = []
+    for chunk_start in range(start, end, chunk_size):
+        chunk_end = min(end, chunk_start + chunk_size)
+        if table is not None:
+            directions = table[scaled_xs[None] - scaled_xs[chunk_start:chunk_end, None] +
+                               ys[None] - ys[chunk_start:chunk_end, None] +
+                               extent * code_base + extent]
+        else:
+            directions = reduce_directions(xs[None] - xs[chunk_start:chunk_end, None],
+                                           ys[None] - ys[chunk_start:chunk_end, None],
+                                           extent, code_base)
+        directions.sort(axis=1)
+        counts.append((directions[:, 1:] != directions[:, :-1]).sum(axis=1))
+    return np.concatenate(counts)
+
+
+def find_best_station(asteroids, workers=None):
+    if not asteroids:
+        raise ValueError("No asteroids to place a station on")
+    xs = np.array([asteroid.x for asteroid in asteroids], dtype=np.int64)
+    ys = np.array([asteroid.y for asteroid in asteroids], dtype=np.int64)
+
+    if workers is None or workers <= 1 or len(asteroids) < 2 * workers:
+        counts = count_visible(xs, ys, 0, len(asteroids))
+    else:
+        bounds = [len(asteroids) * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = np.concatenate(list(executor.map(
+                count_visible, repeat(xs), repeat(ys), bounds[:-1], bounds[1:])))
+
+    best = int(np.argmax(counts))
+    return asteroids[best], int(counts[best])
 
 
 if __name__ == "__main__":
@@ -1,86 +1,153 @@
 #!/usr/bin/env python
 
-import copy
 import functools
-import itertools
 import math
 import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 
-class Moon():
-    def __init__(self, x, y, z):
-        self.x = x
-        self.y = y
-        self.z = z
-        self.start_x = x
-        self.start_y = y
-        self.start_z = z
-        self.vx = 0
-        self.vy = 0
-        self.vz = 0
+SMALL_SYSTEM_THRESHOLD = 4
+SORTED_GRAVITY_THRESHOLD = 32
+MAX_TRACE_STEPS = 1 << 22
+
+
+class MoonSystem():
+    def __init__(self, positions, velocities=None):
+        self.positions = np.array(positions, dtype=np.int64)
+        if velocities is None:
+            self.velocities = np.zeros_like(self.positions)
+        else:
+            self.velocities = np.array(velocities, dtype=np.int64)
+        if self.positions.ndim != 2 or self.positions.shape != self.velocities.shape:
+            raise ValueError(f"Invalid moon state shape {self.positions.shape}")
 
     def __str__(self):
-        return f"x={self.x}, y={self.y}, z={self.z}, vx={self.vx}, vy={self.vy}, vz = {self.vz}"
+        return "\n".join(f"pos={list(p)}, vel={list(v)}"
+                         for p, v in zip(self.positions, self.velocities))
+
+    def step(self, count=1):
+        positions = self.positions
+        velocities = self.velocities
+        num_moons = len(positions)
+        if num_moons <= SMALL_SYSTEM_THRESHOLD:
+            for axis in range(positions.shape[1]):
+                axis_positions = positions[:, axis].tolist()
+                axis_velocities = velocities[:, axis].tolist()
+                for _ in range(count):
+                    step_axis(axis_positions, axis_velocities)
+                positions[:, axis] = axis_positions
+                velocities[:, axis] = axis_velocities
+            return
+        for _ in range(count):
+            if num_moons <= SORTED_GRAVITY_THRESHOLD:
+                velocities += np.sign(positions[None] - positions[:, None]).sum(axis=1)
+            else:
+                for axis in range(positions.shape[1]):
+                    column = positions[:, axis]
+                    ordered = np.sort(column)
+                    num_less = np.searchsorted(ordered, column, 'left')
+                    num_greater = num_moons - np.searchsorted(ordered, column, 'right')
+                    velocities[:, axis] += num_greater - num_less
+            positions += velocities
+
+    def energies(self):
+        return np.abs(self.positions).sum(axis=1) * np.abs(self.velocities).sum(axis=1)
 
     def total_energy(self):
-        return (abs(self.x) + abs(self.y) + abs(self.z)) * (abs(self.vx) + abs(self.vy) + abs(self.vz))
+        return int(self.energies().sum())
+
+
+def step_axis(positions, velocities):
+    for i, position in enumerate(positions):
+        for other in positions:
+            if other > position:
+                velocities[i] += 1
+            elif other < position:
+                velocities[i] -= 1
+    for i, velocity in enumerate(velocities):
+        positions[i] += velocity
 
 
 def main():
-    input_moons = []
     with open('day-12-input.txt') as f:
         re_matches = [re.match(r"^<x=(-?\d+), y=(-?\d+), z=(-?\d+)>$", x)
                       for x in f.readlines()]
-        input_moons = [Moon(int(x.group(1)), int(x.group(2)), int(x.group(3)))
-                       for x in re_matches]
-
-    moons = [copy.deepcopy(x) for x in input_moons]
-    for _ in range(1000):
-        time_step(moons)
-    print(f"Part 1: {sum([x.total_energy() for x in moons])}")
-
-    moons = [copy.deepcopy(x) for x in input_moons]
-    repeats = {}
-    count = 1
-    time_step(moons)
-    while len(repeats) < 3:
-        if 'x' not in repeats and all(m.x == m.start_x and m.vx == 0 for m in moons):
-            repeats['x'] = count
-        if 'y' not in repeats and all(m.y == m.start_y and m.vy == 0 for m in moons):
-            repeats['y'] = count
-        if 'z' not in repeats and all(m.z == m.start_z and m.vz == 0 for m in moons):
-            repeats['z'] = count
-
-        time_step(moons)
-        count += 1
-
-    print(f"Part 2: {lcm(list(repeats.values()))}")
-
-
-def time_step(moons):
-    for first, second in itertools.combinations(moons, 2):
-        if first.x > second.x:
-            first.vx -= 1
-            second.vx += 1
-        elif first.x < second.x:
-            first.vx += 1
-            second.vx -= 1
-        if first.y > second.y:
-            first.vy -= 1
-            second.vy += 1
-        elif first.y < second.y:
-            first.vy += 1
-            second.vy -= 1
-        if first.z > second.z:
-            first.vz -= 1
-            second.vz += 1
-        elif first.z < second.z:
-            first.vz += 1
-            second.vz -= 1
-    for moon in moons:
-        moon.x += moon.vx
-        moon.y += moon.vy
-        moon.z += moon.vz
+        input_positions = [[int(x.group(1)), int(x.group(2)), int(x.group(3))]
+                           for x in re_matches]
+
+    trajectory = MoonTrajectory(input_positions)
+    print(f"Part 1: {trajectory.energy_at(1000)}")
+    print(f"Part 2: {trajectory.period()}")
+
+
+def trace_axis(axis_positions):
+    if len(axis_positions) <= SMALL_SYSTEM_THRESHOLD:
+        positions = list(axis_positions)
+        velocities = [0] * len(positions)
+        history = array('q')
+        while True:
+            history.extend(positions)
+            step_axis(positions, velocities)
+            if not any(velocities):
+                break
+            check_trace_length(history, axis_positions)
+        final_positions = positions
+    else:
+        moons = MoonSystem([[position] for position in axis_positions])
+        history = array('q')
+        while True:
+            history.frombytes(moons.positions.tobytes())
+            moons.step()
+            if not moons.velocities.any():
+                break
+            check_trace_length(history, axis_positions)
+        final_positions = moons.positions[:, 0].tolist()
+    trajectory = np.frombuffer(history, dtype=np.int64).reshape(-1, len(axis_positions))
+    if np.iinfo(np.int32).min <= trajectory.min() and trajectory.max() <= np.iinfo(np.int32).max:
+        trajectory = trajectory.astype(np.int32)
+    is_mirrored = final_positions != list(axis_positions)
+    return trajectory, is_mirrored
+
+
+def check_trace_length(history, axis_positions):
+    if len(history) > MAX_TRACE_STEPS * len(axis_positions):
+        raise ValueError(
+            f"Axis {list(axis_positions)} did not come to rest within {MAX_TRACE_STEPS} steps")
+
+
+class MoonTrajectory():
+    def __init__(self, positions):
+        axes = list(zip(*positions))
+        with ProcessPoolExecutor(max_workers=len(axes)) as executor:
+            traces = list(executor.map(trace_axis, axes))
+        self.__half_trajectories = [trajectory for trajectory, _ in traces]
+        self.axis_periods = [len(trajectory) * (2 if is_mirrored else 1)
+                             for trajectory, is_mirrored in traces]
+
+    def period(self):
+        return lcm(self.axis_periods)
+
+    def __axis_positions(self, axis, step):
+        half_trajectory = self.__half_trajectories[axis]
+        period = self.axis_periods[axis]
+        step %= period
+        if step >= len(half_trajectory):
+            step = period - 1 - step
+        return half_trajectory[step].astype(np.int64)
+
+    def state_at(self, step):
+        if step < 0:
+            raise ValueError(f"Invalid time step {step}")
+        positions = np.stack([self.__axis_positions(axis, step)
+                              for axis in range(len(self.axis_periods))], axis=1)
+        previous_positions = np.stack([self.__axis_positions(axis, step - 1)
+                                       for axis in range(len(self.axis_periods))], axis=1)
+        return MoonSystem(positions, positions - previous_positions)
+
+    def energy_at(self, step):
+        return self.state_at(step).total_energy()
 
 
 def lcm(values):
@@ -0,0 +1,84 @@
+GROW_CHUNK = 64
+
+
+class HullGrid:
+    def __init__(self, chunk_size=GROW_CHUNK):
+        self.__chunk_size = chunk_size
+        self.__min_x = -chunk_size
+        self.__min_y = -chunk_size
+        self.__width = 2 * chunk_size
+        self.__height = 2 * chunk_size
+        self.__colors = bytearray(self.__width * self.__height)
+        self.__painted = bytearray(self.__width * self.__height)
+        self.__painted_count = 0
+
+    def __contains(self, x, y):
+        return (0 <= x - self.__min_x < self.__width and
+                0 <= y - self.__min_y < self.__height)
+
+    def __index(self, x, y):
+        if not self.__contains(x, y):
+            self.__grow(x, y)
+        return (y - self.__min_y) * self.__width + x - self.__min_x
+
+    def __grow(self, x, y):
+        chunk_size = self.__chunk_size
+        min_x, min_y = self.__min_x, self.__min_y
+        max_x, max_y = min_x + self.__width, min_y + self.__height
+        if x < min_x:
+            min_x = min(x - chunk_size, min_x - self.__width)
+        elif x >= max_x:
+            max_x = max(x + chunk_size, max_x + self.__width)
+        if y < min_y:
+            min_y = min(y - chunk_size, min_y - self.__height)
+        elif y >= max_y:
+            max_y = max(y + chunk_size, max_y + self.__height)
+        width = max_x - min_x
+        height = max_y - min_y
+
+        colors = bytearray(width * height)
+        painted = bytearray(width * height)
+        offset_x = self.__min_x - min_x
+        offset_y = self.__min_y - min_y
+        for row in range(self.__height):
+            old_start = row * self.__width
+            new_start = (row + offset_y) * width + offset_x
+            colors[new_start:new_start + self.__width] = \
+                self.__colors[old_start:old_start + self.__width]
+            painted[new_start:new_start + self.__width] = \
+                self.__painted[old_start:old_start + self.__width]
+
+        self.__min_x = min_x
+        self.__min_y = min_y
+        self.__width = width
+        self.__height = height
+        self.__colors = colors
+        self.__painted = painted
+
+    def get(self, x, y):
+        if not self.__contains(x, y):
+            return 0
+        return self.__colors[(y - self.__min_y) * self.__width + x - self.__min_x]
+
+    def paint(self, x, y, color):
+        if color not in (0, 1):
+            raise ValueError(f"Invalid panel color {color}")
+        index = self.__index(x, y)
+        self.__colors[index] = color
+        if not self.__painted[index]:
+            self.__painted[index] = 1
+            self.__painted_count += 1
+
+    def painted_count(self):
+        return self.__painted_count
+
+    def pixel_rows(self):
+        rows = [self.__colors[start:start + self.__width]
+                for start in range(0, len(self.__colors), self.__width)]
+        occupied = [row_number for row_number, row in enumerate(rows) if any(row)]
+        if not occupied:
+            return []
+        rows = rows[occupied[0]:occupied[-1] + 1][::-1]
+        left = min(len(row) - len(row.lstrip(b'\x00')) for row in rows)
+        right = max(len(row.rstrip(b'\x00')) for row in rows)
+        return [row[left:right] for row in rows]
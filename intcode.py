@@ -0,0 +1,550 @@
+import json
+import os
+import sys
+import time
+from array import array
+from collections import Counter, deque, namedtuple
+
+
+class IntcodeComputer():
+    ADD = 1
+    MULTIPLY = 2
+    INPUT = 3
+    OUTPUT = 4
+    JUMP_IF_TRUE = 5
+    JUMP_IF_FALSE = 6
+    LESS_THAN = 7
+    EQUAL_TO = 8
+    ADJUST_REL_BASE = 9
+    HALT = 99
+
+    OPCODE_TO_INST_SIZE = {
+        ADD: 4,
+        MULTIPLY: 4,
+        INPUT: 2,
+        OUTPUT: 2,
+        JUMP_IF_TRUE: 3,
+        JUMP_IF_FALSE: 3,
+        LESS_THAN: 4,
+        EQUAL_TO: 4,
+        ADJUST_REL_BASE: 2,
+        HALT: 1
+    }
+
+    MAX_INST_SIZE = max(OPCODE_TO_INST_SIZE.values())
+
+    OPCODE_NAMES = {
+        ADD: "ADD",
+        MULTIPLY: "MULTIPLY",
+        INPUT: "INPUT",
+        OUTPUT: "OUTPUT",
+        JUMP_IF_TRUE: "JUMP_IF_TRUE",
+        JUMP_IF_FALSE: "JUMP_IF_FALSE",
+        LESS_THAN: "LESS_THAN",
+        EQUAL_TO: "EQUAL_TO",
+        ADJUST_REL_BASE: "ADJUST_REL_BASE",
+        HALT: "HALT"
+    }
+
+    BLOCK_OPCODES = {ADD, MULTIPLY, LESS_THAN, EQUAL_TO, ADJUST_REL_BASE}
+    BLOCK_END_OPCODES = {JUMP_IF_TRUE, JUMP_IF_FALSE}
+
+    POSITION_MODE = 0
+    IMMEDIATE_MODE = 1
+    RELATIVE_MODE = 2
+
+    PAGE_BITS = 8
+    PAGE_SIZE = 1 << PAGE_BITS
+    PAGE_MASK = PAGE_SIZE - 1
+    MAX_DENSE_SIZE = 1 << 20
+
+    STATUS_RUNNING = 0
+    STATUS_NEEDS_INPUT = 1
+    STATUS_OUTPUT = 2
+    STATUS_HALTED = 3
+
+    PROFILE_TABLE = "table"
+    PROFILE_JSON = "json"
+    DEFAULT_PROFILE = os.environ.get("INTCODE_PROFILE")
+    PROFILE_REPORT_ROWS = 20
+
+    Operand = namedtuple("Operand", "value mode")
+    Instruction = namedtuple(
+        "Instruction", "opcode operands next_address modes readers writers")
+    CompiledBlock = namedtuple("CompiledBlock", "function size")
+    Snapshot = namedtuple(
+        "Snapshot", "pages sparse_pages image_size written_cells decoded instruction_pointer relative_base "
+        "is_halted inputs outputs last_output")
+
+    def __init__(self, memory, compile_blocks=False, profile=None):
+        self.__pages = []
+        self.__sparse_pages = {}
+        self.__shared_pages = set()
+        self.__memory_size = 0
+        self.__image_size = 0
+        self.__written_cells = set()
+        self.__program_size = 0
+        self.__load_image(memory)
+        self.__inputs = deque()
+        self.__outputs = deque()
+        self.__is_halted = False
+        self.__output_handler = None
+        self.__input_provider = None
+        self.__discard_outputs = False
+        self.__last_output = 0
+        self.__decoded = {}
+        self.__compile_blocks = compile_blocks
+        self.__blocks = {}
+        self.__block_cells = {}
+        self.__interpreted_addresses = set()
+        self.__instruction_pointer = 0
+        self.__relative_base = 0
+        self.__profile = profile if profile is not None else IntcodeComputer.DEFAULT_PROFILE
+        self.__profile_counts = Counter() if self.__profile else None
+        self.__profile_jump_targets = Counter() if self.__profile else None
+        self.__profile_wall_time = 0.0
+
+    def __load_image(self, memory):
+        if hasattr(memory, "tobytes"):
+            image = array('q')
+            image.frombytes(memory.tobytes())
+        else:
+            image = array('q', memory)
+        self.__image_size = len(image)
+        self.__program_size = len(image)
+        image.extend(array('q', bytes(8 * (-len(image) % IntcodeComputer.PAGE_SIZE))))
+        self.__pages = [image[i:i + IntcodeComputer.PAGE_SIZE]
+                        for i in range(0, len(image), IntcodeComputer.PAGE_SIZE)]
+        self.__memory_size = len(image)
+
+    def __read_memory(self, address):
+        if 0 <= address < self.__memory_size:
+            return self.__pages[address >> IntcodeComputer.PAGE_BITS][address & IntcodeComputer.PAGE_MASK]
+        if address < 0:
+            raise ValueError(f"Invalid memory address {address}")
+        page = self.__sparse_pages.get(address >> IntcodeComputer.PAGE_BITS)
+        return page[address & IntcodeComputer.PAGE_MASK] if page is not None else 0
+
+    def __write_memory(self, address, value):
+        if address >= self.__image_size and address not in self.__written_cells:
+            self.__written_cells.add(address)
+            self.__program_size = self.__image_size + len(self.__written_cells)
+        page_number = address >> IntcodeComputer.PAGE_BITS
+        if 0 <= address < self.__memory_size:
+            page = self.__pages[page_number]
+        else:
+            page = self.__allocate_page(address)
+        if page_number in self.__shared_pages:
+            page = page[:]
+            self.__set_page(page_number, page)
+            self.__shared_pages.discard(page_number)
+        try:
+            page[address & IntcodeComputer.PAGE_MASK] = value
+        except OverflowError:
+            # Only pages that need values beyond 64 bits fall back to lists.
+            self.__set_page(page_number, list(page))
+            self.__write_memory(address, value)
+            return
+        self.__invalidate_decoded(address)
+
+    def __allocate_page(self, address):
+        if address < 0:
+            raise ValueError(f"Invalid memory address {address}")
+        page_number = address >> IntcodeComputer.PAGE_BITS
+        if address < IntcodeComputer.MAX_DENSE_SIZE:
+            while len(self.__pages) <= page_number:
+                self.__pages.append(array('q', bytes(8 * IntcodeComputer.PAGE_SIZE)))
+            self.__memory_size = len(self.__pages) * IntcodeComputer.PAGE_SIZE
+            return self.__pages[page_number]
+        if page_number not in self.__sparse_pages:
+            self.__sparse_pages[page_number] = array(
+                'q', bytes(8 * IntcodeComputer.PAGE_SIZE))
+        return self.__sparse_pages[page_number]
+
+    def __set_page(self, page_number, page):
+        if page_number < len(self.__pages):
+            self.__pages[page_number] = page
+        else:
+            self.__sparse_pages[page_number] = page
+
+    def __decode(self, address):
+        mem_value = self.__read_memory(address)
+        opcode = mem_value % 100
+
+        if opcode not in IntcodeComputer.OPCODE_TO_INST_SIZE:
+            raise ValueError(f"{opcode} is not a valid opcode")
+
+        inst_size = IntcodeComputer.OPCODE_TO_INST_SIZE[opcode]
+        operands = []
+        param_mode = mem_value // 100
+        for j in range(1, inst_size):
+            operands.append(IntcodeComputer.Operand(
+                self.__read_memory(address + j), param_mode % 10))
+            param_mode //= 10
+
+        instruction = IntcodeComputer.Instruction(
+            opcode, tuple(operands), address + inst_size, mem_value // 100,
+            tuple(IntcodeComputer.__make_reader(operand) for operand in operands),
+            tuple(IntcodeComputer.__make_writer(operand) for operand in operands))
+        self.__decoded[address] = instruction
+        return instruction
+
+    @staticmethod
+    def __make_reader(operand):
+        value = operand.value
+        if operand.mode == IntcodeComputer.POSITION_MODE:
+            return lambda read, relative_base: read(value)
+        elif operand.mode == IntcodeComputer.IMMEDIATE_MODE:
+            return lambda read, relative_base: value
+        elif operand.mode == IntcodeComputer.RELATIVE_MODE:
+            return lambda read, relative_base: read(relative_base + value)
+
+        def unsupported(read, relative_base):
+            raise ValueError(f"Unsupported parameter mode {operand.mode}")
+        return unsupported
+
+    @staticmethod
+    def __make_writer(operand):
+        offset = operand.value
+        if operand.mode == IntcodeComputer.POSITION_MODE:
+            return lambda write, relative_base, value: write(offset, value)
+        elif operand.mode == IntcodeComputer.RELATIVE_MODE:
+            return lambda write, relative_base, value: write(relative_base + offset, value)
+
+        def unsupported(write, relative_base, value):
+            raise ValueError(f"Unsupported parameter mode {operand.mode}")
+        return unsupported
+
+    def __invalidate_decoded(self, address):
+        for start in range(address - IntcodeComputer.MAX_INST_SIZE + 1, address + 1):
+            instruction = self.__decoded.get(start)
+            if instruction is not None and instruction.next_address > address:
+                del self.__decoded[start]
+        if address in self.__block_cells:
+            self.__invalidate_blocks(address)
+
+    def __invalidate_blocks(self, address):
+        for start in self.__block_cells.pop(address):
+            block = self.__blocks.pop(start, None)
+            if block is None:
+                continue
+            self.__interpreted_addresses.add(start)
+            for cell in range(start, start + block.size):
+                starts = self.__block_cells.get(cell)
+                if starts is not None:
+                    starts.discard(start)
+                    if not starts:
+                        del self.__block_cells[cell]
+
+    def __compile_block(self, start):
+        def value_expr(operand):
+            if operand.mode == IntcodeComputer.POSITION_MODE:
+                if 0 <= operand.value < self.__memory_size:
+                    return (f"pages[{operand.value >> IntcodeComputer.PAGE_BITS}]"
+                            f"[{operand.value & IntcodeComputer.PAGE_MASK}]")
+                return f"read({operand.value})"
+            elif operand.mode == IntcodeComputer.IMMEDIATE_MODE:
+                return f"{operand.value}"
+            elif operand.mode == IntcodeComputer.RELATIVE_MODE:
+                return f"read(relative_base + {operand.value})"
+            return None
+
+        def target_expr(operand):
+            if operand.mode == IntcodeComputer.POSITION_MODE:
+                return f"{operand.value}"
+            elif operand.mode == IntcodeComputer.RELATIVE_MODE:
+                return f"relative_base + {operand.value}"
+            return None
+
+        lines = []
+        address = start
+        count = 0
+        while True:
+            try:
+                instruction = self.__decoded.get(address) or self.__decode(address)
+            except ValueError:
+                break
+            opcode, operands, next_address = instruction[:3]
+            if (opcode not in IntcodeComputer.BLOCK_OPCODES
+                    and opcode not in IntcodeComputer.BLOCK_END_OPCODES):
+                break
+            values = [value_expr(operand) for operand in operands]
+            if None in values:
+                break
+
+            if opcode == IntcodeComputer.ADJUST_REL_BASE:
+                lines.append(f"relative_base += {values[0]}")
+            elif opcode in IntcodeComputer.BLOCK_END_OPCODES:
+                condition = "!=" if opcode == IntcodeComputer.JUMP_IF_TRUE else "=="
+                lines.append(f"if {values[0]} {condition} 0:")
+                lines.append(f"    return {values[1]}, relative_base, {count + 1}")
+                lines.append(f"return {next_address}, relative_base, {count + 1}")
+                address = next_address
+                count += 1
+                break
+            else:
+                target = target_expr(operands[2])
+                if target is None:
+                    break
+                if opcode == IntcodeComputer.ADD:
+                    result = f"{values[0]} + {values[1]}"
+                elif opcode == IntcodeComputer.MULTIPLY:
+                    result = f"{values[0]} * {values[1]}"
+                elif opcode == IntcodeComputer.LESS_THAN:
+                    result = f"1 if {values[0]} < {values[1]} else 0"
+                else:
+                    result = f"1 if {values[0]} == {values[1]} else 0"
+                lines.append(f"address = {target}")
+                lines.append("if address in block_cells:")
+                lines.append(f"    write(address, {result})")
+                lines.append(
+                    f"    return {next_address}, relative_base, {count + 1}")
+                lines.append(f"write(address, {result})")
+            address = next_address
+            count += 1
+
+        if count == 0:
+            self.__interpreted_addresses.add(start)
+            return None
+        if not lines[-1].startswith("return"):
+            lines.append(f"return {address}, relative_base, {count}")
+
+        source = "def block(pages, read, write, block_cells, relative_base):\n" + \
+            "".join(f"    {line}\n" for line in lines)
+        namespace = {}
+        exec(compile(source, f"<intcode block {start}>", "exec"), namespace)
+        block = IntcodeComputer.CompiledBlock(namespace["block"], count)
+        self.__blocks[start] = block
+        for cell in range(start, address):
+            self.__block_cells.setdefault(cell, set()).add(start)
+        return block
+
+    def __execute(self, max_steps, stop_on_output):
+        if self.__is_halted:
+            return IntcodeComputer.STATUS_HALTED
+        if self.__profile:
+            started = time.perf_counter()
+
+        read = self.__read_memory
+        write = self.__write_memory
+        decoded = self.__decoded
+        profile_counts = self.__profile_counts
+        jump_targets = self.__profile_jump_targets
+        compile_blocks = self.__compile_blocks and profile_counts is None
+        blocks = self.__blocks
+        interpreted_addresses = self.__interpreted_addresses
+        relative_base = self.__relative_base
+        i = self.__instruction_pointer
+        status = IntcodeComputer.STATUS_RUNNING
+        remaining_steps = -1 if max_steps is None else max_steps
+        while remaining_steps != 0:
+            if i >= self.__program_size:
+                self.__is_halted = True
+                status = IntcodeComputer.STATUS_HALTED
+                break
+
+            if compile_blocks and i not in interpreted_addresses:
+                block = blocks.get(i)
+                if block is None:
+                    block = self.__compile_block(i)
+                if block is not None and (remaining_steps < 0 or remaining_steps >= block.size):
+                    i, relative_base, executed = block.function(
+                        self.__pages, read, write, self.__block_cells, relative_base)
+                    remaining_steps -= executed
+                    continue
+
+            instruction = decoded.get(i)
+            if instruction is None:
+                instruction = self.__decode(i)
+            opcode, _, next_address, modes, readers, writers = instruction
+            remaining_steps -= 1
+            if profile_counts is not None:
+                profile_counts[(i, opcode, modes)] += 1
+
+            if opcode == IntcodeComputer.ADD:
+                value1 = readers[0](read, relative_base)
+                value2 = readers[1](read, relative_base)
+                writers[2](write, relative_base, value1 + value2)
+            elif opcode == IntcodeComputer.MULTIPLY:
+                value1 = readers[0](read, relative_base)
+                value2 = readers[1](read, relative_base)
+                writers[2](write, relative_base, value1 * value2)
+            elif opcode == IntcodeComputer.INPUT:
+                value = None
+                if self.__inputs:
+                    value = self.__inputs.popleft()
+                elif self.__input_provider is not None:
+                    value = self.__input_provider()
+                if value is None:
+                    status = IntcodeComputer.STATUS_NEEDS_INPUT
+                    break
+                writers[0](write, relative_base, value)
+            elif opcode == IntcodeComputer.OUTPUT:
+                output = readers[0](read, relative_base)
+                if self.__output_handler is not None:
+                    self.__output_handler(output)
+                elif not self.__discard_outputs:
+                    self.__outputs.append(output)
+                self.__last_output = output
+                if stop_on_output:
+                    i = next_address
+                    status = IntcodeComputer.STATUS_OUTPUT
+                    break
+            elif opcode == IntcodeComputer.JUMP_IF_TRUE:
+                value = readers[0](read, relative_base)
+                if value != 0:
+                    i = readers[1](read, relative_base)
+                    if jump_targets is not None:
+                        jump_targets[i] += 1
+                    continue
+            elif opcode == IntcodeComputer.JUMP_IF_FALSE:
+                value = readers[0](read, relative_base)
+                if value == 0:
+                    i = readers[1](read, relative_base)
+                    if jump_targets is not None:
+                        jump_targets[i] += 1
+                    continue
+            elif opcode == IntcodeComputer.LESS_THAN:
+                value1 = readers[0](read, relative_base)
+                value2 = readers[1](read, relative_base)
+                writers[2](write, relative_base, 1 if value1 < value2 else 0)
+            elif opcode == IntcodeComputer.EQUAL_TO:
+                value1 = readers[0](read, relative_base)
+                value2 = readers[1](read, relative_base)
+                writers[2](write, relative_base, 1 if value1 == value2 else 0)
+            elif opcode == IntcodeComputer.ADJUST_REL_BASE:
+                relative_base += readers[0](read, relative_base)
+            elif opcode == IntcodeComputer.HALT:
+                self.__is_halted = True
+                status = IntcodeComputer.STATUS_HALTED
+                break
+
+            i = next_address
+
+        self.__instruction_pointer = i
+        self.__relative_base = relative_base
+        if self.__profile:
+            self.__profile_wall_time += time.perf_counter() - started
+            if status == IntcodeComputer.STATUS_HALTED:
+                self.__report_profile()
+        return status
+
+    def get_profile(self):
+        if not self.__profile:
+            return None
+        opcodes = Counter()
+        modes = Counter()
+        addresses = Counter()
+        for (address, opcode, mode_digits), count in self.__profile_counts.items():
+            name = IntcodeComputer.OPCODE_NAMES[opcode]
+            num_operands = IntcodeComputer.OPCODE_TO_INST_SIZE[opcode] - 1
+            mode_names = "".join(str(mode_digits // 10 ** j % 10)
+                                 for j in range(num_operands))
+            opcodes[name] += count
+            modes[f"{name} {mode_names}".rstrip()] += count
+            addresses[address] += count
+        return {
+            "instructions": sum(opcodes.values()),
+            "wall_time": self.__profile_wall_time,
+            "opcodes": dict(opcodes.most_common()),
+            "modes": dict(modes.most_common()),
+            "addresses": dict(addresses.most_common()),
+            "jump_targets": dict(self.__profile_jump_targets.most_common())
+        }
+
+    def __report_profile(self):
+        profile = self.get_profile()
+        if self.__profile == IntcodeComputer.PROFILE_JSON:
+            print(json.dumps(profile), file=sys.stderr)
+            return
+
+        lines = [f"{profile['instructions']} instructions in {profile['wall_time']:.3f}s"]
+        for title in ("opcodes", "modes", "addresses", "jump_targets"):
+            lines.append(f"{title}:")
+            rows = list(profile[title].items())[:IntcodeComputer.PROFILE_REPORT_ROWS]
+            for key, count in rows:
+                lines.append(f"  {key!s:<24}{count:>12}")
+        print("\n".join(lines), file=sys.stderr)
+
+    def snapshot(self):
+        self.__shared_pages.update(range(len(self.__pages)))
+        self.__shared_pages.update(self.__sparse_pages)
+        return IntcodeComputer.Snapshot(
+            tuple(self.__pages), dict(self.__sparse_pages), self.__image_size,
+            frozenset(self.__written_cells), dict(self.__decoded),
+            self.__instruction_pointer, self.__relative_base, self.__is_halted,
+            tuple(self.__inputs), tuple(self.__outputs), self.__last_output)
+
+    def restore(self, snapshot):
+        self.__pages = list(snapshot.pages)
+        self.__sparse_pages = dict(snapshot.sparse_pages)
+        self.__shared_pages = set(range(len(self.__pages)))
+        self.__shared_pages.update(self.__sparse_pages)
+        self.__memory_size = len(self.__pages) * IntcodeComputer.PAGE_SIZE
+        self.__image_size = snapshot.image_size
+        self.__written_cells = set(snapshot.written_cells)
+        self.__program_size = self.__image_size + len(self.__written_cells)
+        self.__decoded = dict(snapshot.decoded)
+        self.__blocks = {}
+        self.__block_cells = {}
+        self.__interpreted_addresses = set()
+        self.__instruction_pointer = snapshot.instruction_pointer
+        self.__relative_base = snapshot.relative_base
+        self.__is_halted = snapshot.is_halted
+        self.__inputs = deque(snapshot.inputs)
+        self.__outputs = deque(snapshot.outputs)
+        self.__last_output = snapshot.last_output
+
+    def fork(self):
+        child = IntcodeComputer([], self.__compile_blocks, self.__profile)
+        child.restore(self.snapshot())
+        return child
+
+    def step(self):
+        return self.__execute(1, True)
+
+    def run(self, max_steps=None):
+        return self.__execute(max_steps, False)
+
+    def run_until_input(self):
+        return self.__execute(None, False)
+
+    def run_until_output(self):
+        return self.__execute(None, True)
+
+    def is_halted(self):
+        return self.__is_halted
+
+    def send_input(self, value):
+        self.__inputs.append(value)
+
+    def send_inputs(self, values):
+        self.__inputs.extend(values)
+
+    def drain_outputs(self):
+        outputs = []
+        while self.__outputs:
+            outputs.append(self.__outputs.popleft())
+        return outputs
+
+    def iter_outputs(self):
+        while self.__outputs:
+            yield self.__outputs.popleft()
+
+    def get_memory_size(self):
+        return self.__memory_size
+
+    def peek(self, address):
+        return self.__read_memory(address)
+
+    def get_last_output(self):
+        return self.__last_output
+
+    def set_output_handler(self, value):
+        self.__output_handler = value
+
+    def set_discard_outputs(self, value):
+        self.__discard_outputs = value
+
+    def set_input_provider(self, value):
+        self.__input_provider = value
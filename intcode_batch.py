@@ -0,0 +1,154 @@
+from collections import deque
+
+import numpy as np
+
+from intcode import IntcodeComputer
+
+
+class BatchIntcodeComputer():
+    def __init__(self, memory, count, strict=True):
+        self.__memory = np.tile(np.array(memory, dtype=np.int64), (count, 1))
+        self.__program_size = len(memory)
+        self.__strict = strict
+        self.__rows = np.arange(count)
+        self.__instruction_pointers = np.zeros(count, dtype=np.int64)
+        self.__relative_bases = np.zeros(count, dtype=np.int64)
+        self.__is_halted = np.zeros(count, dtype=bool)
+        self.__is_waiting_for_input = np.zeros(count, dtype=bool)
+        self.__inputs = [deque() for _ in range(count)]
+        self.__outputs = []
+        self.__last_outputs = np.zeros(count, dtype=np.int64)
+
+    def __ensure_memory(self, addresses):
+        if len(addresses) == 0:
+            return
+        if addresses.min() < 0:
+            raise ValueError(f"Invalid memory address {addresses.min()}")
+        width = self.__memory.shape[1]
+        if addresses.max() >= width:
+            new_width = max(2 * width, int(addresses.max()) + 1)
+            self.__memory = np.pad(self.__memory, ((0, 0), (0, new_width - width)))
+
+    def __resolve_values(self, rows, raw, mode):
+        if mode == IntcodeComputer.POSITION_MODE:
+            self.__ensure_memory(raw)
+            return self.__memory[rows, raw]
+        elif mode == IntcodeComputer.IMMEDIATE_MODE:
+            return raw
+        elif mode == IntcodeComputer.RELATIVE_MODE:
+            addresses = self.__relative_bases[rows] + raw
+            self.__ensure_memory(addresses)
+            return self.__memory[rows, addresses]
+        raise ValueError(f"Unsupported parameter mode {mode}")
+
+    def __resolve_targets(self, rows, raw, mode):
+        if mode == IntcodeComputer.POSITION_MODE:
+            addresses = raw
+        elif mode == IntcodeComputer.RELATIVE_MODE:
+            addresses = self.__relative_bases[rows] + raw
+        else:
+            raise ValueError(f"Unsupported parameter mode {mode}")
+        self.__ensure_memory(addresses)
+        return addresses
+
+    def __execute_group(self, rows, address, mem_value):
+        opcode = mem_value % 100
+        if opcode not in IntcodeComputer.OPCODE_TO_INST_SIZE:
+            if self.__strict:
+                raise ValueError(f"{opcode} is not a valid opcode")
+            self.__is_halted[rows] = True
+            return
+        inst_size = IntcodeComputer.OPCODE_TO_INST_SIZE[opcode]
+        self.__ensure_memory(np.array([address + inst_size - 1]))
+        modes = [mem_value // 10 ** (j + 2) % 10 for j in range(inst_size - 1)]
+        raw = [self.__memory[rows, address + j + 1] for j in range(inst_size - 1)]
+        next_address = address + inst_size
+
+        if opcode in (IntcodeComputer.ADD, IntcodeComputer.MULTIPLY,
+                      IntcodeComputer.LESS_THAN, IntcodeComputer.EQUAL_TO):
+            value1 = self.__resolve_values(rows, raw[0], modes[0])
+            value2 = self.__resolve_values(rows, raw[1], modes[1])
+            targets = self.__resolve_targets(rows, raw[2], modes[2])
+            if opcode == IntcodeComputer.ADD:
+                result = value1 + value2
+            elif opcode == IntcodeComputer.MULTIPLY:
+                result = value1 * value2
+            elif opcode == IntcodeComputer.LESS_THAN:
+                result = (value1 < value2).astype(np.int64)
+            else:
+                result = (value1 == value2).astype(np.int64)
+            self.__memory[rows, targets] = result
+        elif opcode == IntcodeComputer.INPUT:
+            has_input = np.array([len(self.__inputs[row]) > 0 for row in rows], dtype=bool)
+            self.__is_waiting_for_input[rows[~has_input]] = True
+            rows = rows[has_input]
+            if len(rows) == 0:
+                return
+            targets = self.__resolve_targets(rows, raw[0][has_input], modes[0])
+            self.__memory[rows, targets] = [self.__inputs[row].popleft() for row in rows]
+        elif opcode == IntcodeComputer.OUTPUT:
+            values = self.__resolve_values(rows, raw[0], modes[0])
+            self.__last_outputs[rows] = values
+            self.__outputs.append((rows, values))
+        elif opcode in (IntcodeComputer.JUMP_IF_TRUE, IntcodeComputer.JUMP_IF_FALSE):
+            values = self.__resolve_values(rows, raw[0], modes[0])
+            targets = self.__resolve_values(rows, raw[1], modes[1])
+            jumped = values != 0 if opcode == IntcodeComputer.JUMP_IF_TRUE else values == 0
+            self.__instruction_pointers[rows] = np.where(jumped, targets, next_address)
+            return
+        elif opcode == IntcodeComputer.ADJUST_REL_BASE:
+            self.__relative_bases[rows] += self.__resolve_values(rows, raw[0], modes[0])
+        elif opcode == IntcodeComputer.HALT:
+            self.__is_halted[rows] = True
+            return
+
+        self.__instruction_pointers[rows] = next_address
+
+    def run(self):
+        while True:
+            running = ~self.__is_halted & ~self.__is_waiting_for_input
+            if not running.any():
+                break
+            rows = self.__rows[running]
+            addresses = self.__instruction_pointers[rows]
+            past_end = addresses >= self.__program_size
+            if past_end.any():
+                self.__is_halted[rows[past_end]] = True
+                continue
+            mem_values = self.__memory[rows, addresses]
+            if (addresses == addresses[0]).all() and (mem_values == mem_values[0]).all():
+                self.__execute_group(rows, int(addresses[0]), int(mem_values[0]))
+                continue
+            groups = np.unique(np.stack([addresses, mem_values]), axis=1)
+            for address, mem_value in groups.T:
+                in_group = (addresses == address) & (mem_values == mem_value)
+                self.__execute_group(rows[in_group], int(address), int(mem_value))
+
+    def send_inputs(self, values, rows=None):
+        if rows is None:
+            rows = self.__rows
+        for row, value in zip(rows.tolist(), values.tolist()):
+            self.__inputs[row].append(value)
+        self.__is_waiting_for_input[rows] = False
+
+    def drain_outputs(self):
+        if not self.__outputs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        rows = np.concatenate([rows for rows, _ in self.__outputs])
+        values = np.concatenate([values for _, values in self.__outputs])
+        self.__outputs = []
+        return rows, values
+
+    def peek(self, address):
+        self.__ensure_memory(np.array([address]))
+        return self.__memory[:, address]
+
+    def poke(self, address, values):
+        self.__ensure_memory(np.array([address]))
+        self.__memory[:, address] = values
+
+    def get_last_outputs(self):
+        return self.__last_outputs
+
+    def is_halted(self):
+        return self.__is_halted.all()
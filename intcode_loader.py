@@ -0,0 +1,46 @@
+import hashlib
+import mmap
+import os
+from array import array
+
+CACHE_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '.intcode-cache')
+
+
+def load_program(path):
+    with open(path, 'rb') as f:
+        text = f.read()
+    cache_path = os.path.join(
+        CACHE_DIR, f'{hashlib.sha256(text).hexdigest()}.bin')
+    if os.path.exists(cache_path):
+        return map_image_cache(cache_path)
+
+    program = parse_program(text)
+    try:
+        write_image_cache(cache_path, program)
+    except OSError:
+        return memoryview(program)
+    return map_image_cache(cache_path)
+
+
+def parse_program(text):
+    text = text.strip()
+    if not text:
+        return array('q')
+    return array('q', map(int, text.split(b',')))
+
+
+def write_image_cache(cache_path, program):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        program.tofile(f)
+    os.replace(temp_path, cache_path)
+
+
+def map_image_cache(cache_path):
+    with open(cache_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(array('q'))
+        image = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(image).cast('q')
@@ -0,0 +1,53 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+SWEEP_CHUNK_SIZE = 1000
+
+sweep_stop_index = None
+
+
+def sweep(program, candidates, predicate, runner, chunk_size=SWEEP_CHUNK_SIZE):
+    chunks = [candidates[i:i + chunk_size]
+              for i in range(0, len(candidates), chunk_size)]
+    stop_index = multiprocessing.Value('q', len(chunks))
+    best_index, best_match = len(chunks), None
+    results = [None] * len(chunks)
+    with ProcessPoolExecutor(initializer=init_sweep_worker,
+                             initargs=(stop_index,)) as executor:
+        futures = {executor.submit(run_sweep_chunk, program, index, chunk, predicate, runner): index
+                   for index, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            result = future.result()
+            index = futures[future]
+            if predicate is None:
+                results[index] = result
+            elif result is not None and index < best_index:
+                best_index, best_match = index, result
+                with stop_index.get_lock():
+                    stop_index.value = min(stop_index.value, index)
+                for pending, pending_index in futures.items():
+                    if pending_index > index:
+                        pending.cancel()
+
+    if predicate is None:
+        return [output for outputs in results for output in outputs]
+    return best_match
+
+
+def init_sweep_worker(stop_index):
+    global sweep_stop_index
+    sweep_stop_index = stop_index
+
+
+def run_sweep_chunk(program, chunk_index, candidates, predicate, runner):
+    if predicate is not None and chunk_index > sweep_stop_index.value:
+        return None
+    outputs = runner(program, candidates)
+    if predicate is None:
+        return list(outputs)
+    matches = np.flatnonzero(predicate(np.asarray(outputs)))
+    return candidates[matches[0]] if len(matches) > 0 else None